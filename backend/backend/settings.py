@@ -127,6 +127,9 @@ SIMPLE_JWT = {
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_ALL_ORIGINS = True
 
+# Flag unusual expenses in the add-expense response
+EXPENSE_ANOMALY_DETECTION = True
+
 # Static & Media files
 STATIC_URL = "/static/"
 MEDIA_URL = "/media/"
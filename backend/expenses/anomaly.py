@@ -0,0 +1,136 @@
+import json
+import math
+import os
+
+# Weight given to the newest observation in the exponentially weighted mean/variance
+EWMA_ALPHA = 0.1
+# How many standard deviations above the mean counts as unusual
+ZSCORE_THRESHOLD = 3.0
+# Don't flag anything until a category (or the daily total) has this much history
+MIN_SAMPLES = 5
+# Floor on the standard deviation, relative to the mean and absolute, so flat or
+# warming-up histories don't turn small increases into huge z-scores
+MIN_STD_RATIO = 0.2
+MIN_STD = 1.0
+
+
+def ewma_update(stats, value):
+    """Update an exponentially weighted mean/variance in place in O(1)"""
+    if stats['count'] == 0:
+        stats['mean'] = value
+        stats['var'] = 0.0
+    else:
+        diff = value - stats['mean']
+        increment = EWMA_ALPHA * diff
+        stats['mean'] += increment
+        stats['var'] = (1 - EWMA_ALPHA) * (stats['var'] + diff * increment)
+    stats['count'] += 1
+
+
+def zscore(stats, value):
+    """How far value sits above the running mean, or None if there isn't enough history"""
+    if stats['count'] < MIN_SAMPLES:
+        return None
+    std = max(math.sqrt(stats['var']), MIN_STD_RATIO * abs(stats['mean']), MIN_STD)
+    return (value - stats['mean']) / std
+
+
+def empty_stats():
+    return {'count': 0, 'mean': 0.0, 'var': 0.0}
+
+
+class SpendingStats:
+    """Per-user streaming spending statistics used to flag unusual expenses.
+
+    Keeps an EWMA mean/variance per category plus one for completed daily totals,
+    so each insert costs constant time and space regardless of history length.
+    """
+
+    def __init__(self, expense_manager):
+        self.expense_manager = expense_manager
+        self.stats_file_path = os.path.join(
+            expense_manager.excel_dir,
+            f'spending_stats_user_{expense_manager.user_id}.json'
+        )
+
+    def empty_state(self):
+        return {'categories': {}, 'daily': empty_stats(), 'day': None, 'day_total': 0.0}
+
+    def load_state(self):
+        """Read persisted statistics, or start from scratch"""
+        try:
+            if os.path.exists(self.stats_file_path):
+                with open(self.stats_file_path) as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"Error reading spending stats: {e}")
+        return self.empty_state()
+
+    def save_state(self, state):
+        """Persist statistics atomically"""
+        tmp_path = self.stats_file_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, separators=(',', ':'))
+        os.replace(tmp_path, self.stats_file_path)
+
+    def observe(self, state, amount, category, date):
+        """Score an expense against the current statistics, then fold it in"""
+        # A new day closes out the previous day's total
+        if state['day'] != date:
+            if state['day'] is not None:
+                ewma_update(state['daily'], state['day_total'])
+            state['day'] = date
+            state['day_total'] = 0.0
+        state['day_total'] += amount
+
+        category_stats = state['categories'].setdefault(category, empty_stats())
+        category_z = zscore(category_stats, amount)
+        daily_z = zscore(state['daily'], state['day_total'])
+        ewma_update(category_stats, amount)
+
+        reasons = []
+        if category_z is not None and category_z > ZSCORE_THRESHOLD:
+            reasons.append(f'Amount is unusually high for {category}')
+        if daily_z is not None and daily_z > ZSCORE_THRESHOLD:
+            reasons.append('Spending today is unusually high')
+
+        return {
+            'is_anomaly': bool(reasons),
+            'reasons': reasons,
+            'category_zscore': _json_number(category_z),
+            'daily_zscore': _json_number(daily_z),
+        }
+
+    def record_expense(self, expense_data):
+        """Check a newly added expense and persist the updated statistics"""
+        state = self.load_state()
+        result = self.observe(
+            state,
+            float(expense_data['amount']),
+            expense_data['category'],
+            expense_data['date']
+        )
+        self.save_state(state)
+        return result
+
+    def rebuild(self, expenses):
+        """Recompute statistics from scratch by replaying the full expense history"""
+        state = self.empty_state()
+        ordered = sorted(expenses, key=lambda x: (str(x.get('date', '')), str(x.get('time', '')), str(x.get('id', ''))))
+        for expense in ordered:
+            if expense.get('amount') in (None, ''):
+                continue
+            self.observe(
+                state,
+                float(expense['amount']),
+                expense.get('category') or 'Others',
+                str(expense.get('date', ''))[:10]
+            )
+        self.save_state(state)
+        return state
+
+
+def _json_number(value):
+    if value is None:
+        return None
+    return round(value, 2)
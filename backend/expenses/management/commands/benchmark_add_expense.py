@@ -0,0 +1,81 @@
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from expenses.views import add_expense
+
+class Command(BaseCommand):
+    help = 'Compare add_expense latency with anomaly detection on and off'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Expenses to add per run')
+        parser.add_argument('--rounds', type=int, default=3, help='Alternating on/off runs to average over')
+        parser.add_argument('--per-day', type=int, default=5, help='Expenses per simulated day')
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        descriptions = ['coffee', 'uber ride', 'grocery run', 'netflix', 'electricity bill']
+        start_day = datetime(2025, 1, 1, 9, 0)
+
+        def run(anomaly_detection):
+            # Fresh, throwaway excel_files directory per run so both start from an empty history
+            base_dir = tempfile.mkdtemp()
+            user = User(id=1, username='benchmark')
+            timings = []
+            clock = {'now': start_day}
+
+            # Advance the simulated clock so the daily-total rollover path is timed too
+            class SimulatedDatetime(datetime):
+                @classmethod
+                def now(cls, tz=None):
+                    return clock['now']
+
+            try:
+                with override_settings(BASE_DIR=base_dir, EXPENSE_ANOMALY_DETECTION=anomaly_detection), \
+                        mock.patch('expenses.views.datetime', SimulatedDatetime):
+                    for i in range(options['requests']):
+                        clock['now'] = start_day + timedelta(days=i // options['per_day'], minutes=i)
+                        request = factory.post('/api/expenses/add/', {
+                            'amount': 50 + (i % 7) * 10,
+                            'description': descriptions[i % len(descriptions)],
+                        }, format='json')
+                        force_authenticate(request, user=user)
+                        start = time.perf_counter()
+                        response = add_expense(request)
+                        timings.append(time.perf_counter() - start)
+                        if response.status_code != 200:
+                            raise RuntimeError(response.data)
+            finally:
+                shutil.rmtree(base_dir, ignore_errors=True)
+            return timings
+
+        # Discarded warm-up absorbs imports, openpyxl start-up and first-touch costs
+        run(True)
+        run(False)
+
+        timings = {'off': [], 'on': []}
+        for round_number in range(options['rounds']):
+            # Alternate which mode goes first so neither consistently benefits from ordering
+            order = ['off', 'on'] if round_number % 2 == 0 else ['on', 'off']
+            for label in order:
+                timings[label].extend(run(label == 'on'))
+
+        results = {}
+        for label, samples in timings.items():
+            samples.sort()
+            results[label] = (sum(samples) / len(samples) * 1000, samples[len(samples) // 2] * 1000)
+            mean_ms, median_ms = results[label]
+            self.stdout.write(f'anomaly detection {label:>3}: mean {mean_ms:.2f} ms, median {median_ms:.2f} ms')
+
+        overhead = results['on'][1] - results['off'][1]
+        self.stdout.write(self.style.SUCCESS(
+            f'Anomaly detection overhead: {overhead:+.2f} ms per add (median, '
+            f'{options["rounds"]} alternating rounds of {options["requests"]} adds)'
+        ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+
+from expenses.recurring import RecurringExpenseDetector
+from expenses.views import ExpenseManager
+
+class Command(BaseCommand):
+    help = 'Incrementally detect recurring expenses for all users (safe to run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Only process the user with this id')
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['user']:
+            users = users.filter(id=options['user'])
+
+        for user in users.iterator():
+            try:
+                detector = RecurringExpenseDetector(ExpenseManager(user.id))
+                recurring = detector.detect(detector.update())
+                self.stdout.write(f'{user.username}: {len(recurring)} recurring expenses')
+            except Exception as e:
+                self.stdout.write(
+                    self.style.ERROR(f'{user.username}: failed to detect recurring expenses ({e})')
+                )
+
+        self.stdout.write(self.style.SUCCESS('Recurring expense detection complete'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+
+from expenses.anomaly import SpendingStats
+from expenses.views import ExpenseManager
+
+class Command(BaseCommand):
+    help = 'Rebuild streaming spending statistics from each user\'s full expense history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Only rebuild the user with this id')
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['user']:
+            users = users.filter(id=options['user'])
+
+        for user in users.iterator():
+            expense_manager = ExpenseManager(user.id)
+            expenses = expense_manager.get_expenses_from_excel()
+            state = SpendingStats(expense_manager).rebuild(expenses)
+            self.stdout.write(
+                f'{user.username}: replayed {len(expenses)} expenses '
+                f'across {len(state["categories"])} categories'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Spending statistics rebuilt'))
@@ -0,0 +1,213 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Charges for the same description are grouped when within ~10% of the group's amount
+AMOUNT_TOLERANCE = 0.10
+# Minimum number of charges before a group can be called recurring
+MIN_OCCURRENCES = 3
+# Only the most recent charge dates are kept per group in the saved state
+MAX_DATES_PER_GROUP = 12
+
+# Allowed range for the median gap (in days) and max jitter around it
+PERIODS = {
+    'weekly': {'min_days': 6, 'max_days': 8, 'tolerance': 2},
+    'monthly': {'min_days': 27, 'max_days': 32, 'tolerance': 4},
+}
+
+
+def normalize_description(descriptions):
+    """Lowercase descriptions and strip digits/punctuation so 'Netflix #123' matches 'netflix'"""
+    return (
+        descriptions.astype(str)
+        .str.lower()
+        .str.replace(r'[^a-z\s]', ' ', regex=True)
+        .str.split()
+        .str.join(' ')
+    )
+
+
+class RecurringExpenseDetector:
+    """Incrementally detects recurring charges (subscriptions, rent, ...) for one user.
+
+    Only rows appended since the last run are processed; per-group charge dates
+    and the processed row offset are persisted next to the user's Excel file.
+    The xlsx format has no random access, so the workbook is still decompressed
+    on each run, but earlier rows are skipped before being parsed into a frame.
+    """
+
+    def __init__(self, expense_manager):
+        self.expense_manager = expense_manager
+        self.state_file_path = os.path.join(
+            expense_manager.excel_dir,
+            f'recurring_user_{expense_manager.user_id}.json'
+        )
+
+    def load_state(self):
+        """Read persisted detector state, or start from scratch"""
+        try:
+            if os.path.exists(self.state_file_path):
+                with open(self.state_file_path) as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"Error reading recurring state: {e}")
+        return {'last_expense_id': 0, 'rows_processed': 0, 'groups': {}}
+
+    def save_state(self, state):
+        """Persist detector state atomically"""
+        tmp_path = self.state_file_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_file_path)
+
+    def _load_new_expenses(self, state):
+        columns = ['id', 'amount', 'description', 'date']
+        if not os.path.exists(self.expense_manager.excel_file_path):
+            return pd.DataFrame(columns=columns)
+        # The workbook is append-only, so rows before the saved offset were already handled
+        rows_processed = state.get('rows_processed', 0)
+        df = pd.read_excel(
+            self.expense_manager.excel_file_path,
+            usecols=columns,
+            skiprows=range(1, rows_processed + 1)
+        )
+        state['rows_processed'] = rows_processed + len(df)
+        df['id'] = pd.to_numeric(df['id'], errors='coerce')
+        return df[df['id'] > state['last_expense_id']].dropna(subset=['id'])
+
+    def _assign_groups(self, new, groups):
+        """Key each new charge to an existing group within AMOUNT_TOLERANCE, or start a new one"""
+        existing = pd.DataFrame(
+            [{'key': key, 'description': g['description'], 'group_amount': g['amount']}
+             for key, g in groups.items()],
+            columns=['key', 'description', 'group_amount']
+        )
+        candidates = new[['description', 'amount']].reset_index().merge(existing, on='description')
+        candidates['distance'] = (
+            (candidates['amount'] - candidates['group_amount']).abs()
+            / candidates['group_amount'].abs().clip(lower=0.01)
+        )
+        candidates = candidates[candidates['distance'] <= AMOUNT_TOLERANCE]
+        nearest = candidates.sort_values('distance').drop_duplicates('index').set_index('index')
+        new['key'] = nearest['key'].reindex(new.index)
+
+        # Cluster the remaining charges among themselves by description and amount
+        unmatched = new[new['key'].isna()].sort_values(['description', 'amount'])
+        if not unmatched.empty:
+            starts_cluster = (
+                (unmatched['description'] != unmatched['description'].shift())
+                | (unmatched['amount'] > unmatched['amount'].shift() * (1 + AMOUNT_TOLERANCE))
+            )
+            cluster = starts_cluster.cumsum()
+            anchor = unmatched.groupby(cluster)['amount'].transform('first')
+            new.loc[unmatched.index, 'key'] = unmatched['description'] + '|' + anchor.round(2).astype(str)
+        return new
+
+    def update(self):
+        """Fold expenses added since the last run into the saved state"""
+        state = self.load_state()
+        batch = self._load_new_expenses(state)
+        if batch.empty:
+            self.save_state(state)
+            return state
+
+        # Every row in the batch counts as processed, even ones that can't be grouped
+        state['last_expense_id'] = int(max(state['last_expense_id'], batch['id'].max()))
+
+        new = pd.DataFrame({
+            'description': normalize_description(batch['description']),
+            'amount': pd.to_numeric(batch['amount'], errors='coerce'),
+            'date': pd.to_datetime(batch['date'], errors='coerce'),
+        }).dropna(subset=['date', 'amount'])
+        new = new[new['description'] != '']
+        if new.empty:
+            self.save_state(state)
+            return state
+        new = self._assign_groups(new, state['groups'])
+
+        # Re-expand the saved dates of only the groups touched by this batch
+        touched = set(new['key'])
+        prior = [
+            {'key': key, 'description': group['description'], 'amount': group['amount'], 'date': date}
+            for key, group in state['groups'].items() if key in touched
+            for date in group['dates']
+        ]
+        prior = pd.DataFrame(prior, columns=['key', 'description', 'amount', 'date'])
+        prior['date'] = pd.to_datetime(prior['date'])
+
+        # Same-day repeats of a charge, within the batch or against saved dates, count once
+        new_charges = new.drop_duplicates(['key', 'date']).merge(
+            prior[['key', 'date']], on=['key', 'date'], how='left', indicator=True
+        )
+        added_counts = new_charges[new_charges['_merge'] == 'left_only'].groupby('key').size()
+
+        combined = (
+            pd.concat([prior, new], ignore_index=True)
+            .drop_duplicates(subset=['key', 'date'], keep='last')
+            .sort_values(['key', 'date'])
+        )
+        combined = combined.groupby('key', sort=False).tail(MAX_DATES_PER_GROUP)
+
+        grouped = combined.groupby('key', sort=False)
+        summary = grouped.agg(description=('description', 'last'), amount=('amount', 'last'))
+        summary['dates'] = grouped['date'].agg(lambda d: d.dt.strftime('%Y-%m-%d').tolist())
+        summary['added'] = added_counts.reindex(summary.index, fill_value=0)
+
+        for key, row in summary.iterrows():
+            previous = state['groups'].get(key, {})
+            state['groups'][key] = {
+                'description': row['description'],
+                'amount': float(row['amount']),
+                'dates': row['dates'],
+                'count': previous.get('count', 0) + int(row['added']),
+            }
+
+        self.save_state(state)
+        return state
+
+    def detect(self, state=None):
+        """Return the groups whose charge dates follow a weekly or monthly cadence"""
+        if state is None:
+            state = self.load_state()
+        rows = [
+            {'key': key, 'date': date}
+            for key, group in state['groups'].items()
+            if len(group['dates']) >= MIN_OCCURRENCES
+            for date in group['dates']
+        ]
+        if not rows:
+            return []
+
+        df = pd.DataFrame(rows)
+        df['date'] = pd.to_datetime(df['date'])
+        df['interval'] = df.groupby('key')['date'].diff().dt.days
+        intervals = df.dropna(subset=['interval'])
+
+        stats = intervals.groupby('key')['interval'].agg(['median', 'min', 'max'])
+        stats['last_date'] = df.groupby('key')['date'].max()
+        stats['jitter'] = np.maximum(stats['max'] - stats['median'], stats['median'] - stats['min'])
+        stats['period'] = None
+        for period, window in PERIODS.items():
+            matches = (
+                stats['median'].between(window['min_days'], window['max_days'])
+                & (stats['jitter'] <= window['tolerance'])
+            )
+            stats.loc[matches, 'period'] = period
+        stats = stats.dropna(subset=['period'])
+        stats['next_expected_date'] = stats['last_date'] + pd.to_timedelta(stats['median'], unit='D')
+
+        recurring = []
+        for key, row in stats.iterrows():
+            group = state['groups'][key]
+            recurring.append({
+                'description': group['description'],
+                'amount': group['amount'],
+                'period': row['period'],
+                'interval_days': float(row['median']),
+                'occurrences': group['count'],
+                'last_date': row['last_date'].strftime('%Y-%m-%d'),
+                'next_expected_date': row['next_expected_date'].strftime('%Y-%m-%d'),
+            })
+        return sorted(recurring, key=lambda r: r['next_expected_date'])
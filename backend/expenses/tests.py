@@ -1,3 +1,207 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+import pandas as pd
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .anomaly import MIN_SAMPLES, SpendingStats
+from .recurring import RecurringExpenseDetector
+from .views import ExpenseManager, add_expense
+
+
+class ExcelTestCase(SimpleTestCase):
+    """Points an ExpenseManager at a throwaway excel_files directory"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.expense_manager = ExpenseManager(1)
+        self.expense_manager.excel_dir = self.tmp_dir
+        self.expense_manager.excel_file_path = os.path.join(self.tmp_dir, 'expenses_user_1.xlsx')
+        self.next_id = 1
+
+    def make_expense(self, amount, description, day, category='Others'):
+        expense = {
+            'id': self.next_id,
+            'amount': amount,
+            'description': description,
+            'category': category,
+            'date': day.strftime('%Y-%m-%d'),
+            'time': '10:00',
+            'user_id': 1,
+        }
+        self.next_id += 1
+        return expense
+
+    def write_expenses(self, expenses):
+        pd.DataFrame(expenses).to_excel(self.expense_manager.excel_file_path, index=False)
+
+
+class RecurringExpenseDetectorTests(ExcelTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.detector = RecurringExpenseDetector(self.expense_manager)
+
+    def monthly(self, amount, description, months, start=date(2025, 1, 5)):
+        return [
+            self.make_expense(amount, description, (pd.Timestamp(start) + pd.DateOffset(months=m)).date())
+            for m in months
+        ]
+
+    def weekly(self, amount, description, weeks, start=date(2025, 3, 1)):
+        return [self.make_expense(amount, description, start + timedelta(weeks=w)) for w in weeks]
+
+    def test_detects_cadence_across_incremental_runs(self):
+        first = self.monthly(649, 'Netflix #1', range(2))
+        self.write_expenses(first)
+        self.assertEqual(self.detector.detect(self.detector.update()), [])
+
+        later = (
+            self.monthly(649, 'Netflix #2', range(2, 5))
+            + self.weekly(200, 'Gym', range(4))
+            + [self.make_expense(30, 'coffee', date(2025, 3, 3))]
+        )
+        self.write_expenses(first + later)
+        state = self.detector.update()
+        self.assertEqual(state['last_expense_id'], self.next_id - 1)
+        self.assertEqual(state['rows_processed'], len(first + later))
+
+        recurring = {r['description']: r for r in self.detector.detect(state)}
+        self.assertEqual(set(recurring), {'netflix', 'gym'})
+        self.assertEqual(recurring['netflix']['period'], 'monthly')
+        self.assertEqual(recurring['netflix']['occurrences'], 5)
+        self.assertEqual(recurring['gym']['period'], 'weekly')
+        self.assertEqual(recurring['gym']['next_expected_date'], '2025-03-29')
+
+    def test_rerun_without_new_expenses_is_a_no_op(self):
+        self.write_expenses(self.weekly(200, 'Gym', range(4)))
+        first = self.detector.update()
+        self.assertEqual(self.detector.update(), first)
+        self.assertEqual(self.detector.detect(), self.detector.detect(first))
+
+    def test_ungroupable_rows_are_marked_processed(self):
+        self.write_expenses(self.weekly(200, 'Gym', range(3)) + [self.make_expense(10, '###', date(2025, 3, 30))])
+        state = self.detector.update()
+        self.assertEqual(state['last_expense_id'], self.next_id - 1)
+
+    def test_same_day_duplicates_count_once(self):
+        charges = self.weekly(200, 'Gym', range(3)) + self.weekly(200, 'Gym', [2])
+        self.write_expenses(charges)
+        state = self.detector.update()
+        self.assertEqual([g['count'] for g in state['groups'].values()], [3])
+
+        self.write_expenses(charges + self.weekly(200, 'Gym', [2]))
+        state = self.detector.update()
+        self.assertEqual([g['count'] for g in state['groups'].values()], [3])
+
+    def test_nearby_amounts_share_a_group(self):
+        # 9.80 and 9.90 straddle a log-scale band edge; they must still be one subscription
+        charges = self.monthly(9.80, 'Spotify', [0, 2]) + self.monthly(9.90, 'Spotify', [1, 3])
+        self.write_expenses(charges[:2])
+        self.detector.update()
+        self.write_expenses(charges)
+        recurring = self.detector.detect(self.detector.update())
+        self.assertEqual(len(recurring), 1)
+        self.assertEqual(recurring[0]['occurrences'], 4)
+
+    def test_different_amounts_stay_separate(self):
+        self.write_expenses(self.monthly(500, 'Rent', range(3)) + [self.make_expense(20, 'Rent', date(2025, 2, 10))])
+        state = self.detector.update()
+        self.assertEqual(sorted(g['count'] for g in state['groups'].values()), [1, 3])
+
+
+class SpendingStatsTests(ExcelTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.stats = SpendingStats(self.expense_manager)
+
+    def observe_days(self, state, amounts, category='Food', start=date(2025, 1, 1)):
+        return [
+            self.stats.observe(state, amount, category, (start + timedelta(days=i)).isoformat())
+            for i, amount in enumerate(amounts)
+        ]
+
+    def test_no_flags_during_warm_up(self):
+        state = self.stats.empty_state()
+        results = self.observe_days(state, [10, 500, 10, 900, 10])
+        self.assertFalse(any(r['is_anomaly'] for r in results))
+        self.assertIsNone(results[-1]['category_zscore'])
+
+    def test_flags_amount_far_above_category_history(self):
+        state = self.stats.empty_state()
+        self.observe_days(state, [100, 102, 98, 101, 99, 100])
+        result = self.stats.observe(state, 900, 'Food', '2025-02-01')
+        self.assertTrue(result['is_anomaly'])
+        self.assertIn('Amount is unusually high for Food', result['reasons'])
+        self.assertIn('Spending today is unusually high', result['reasons'])
+        self.assertGreater(result['category_zscore'], 3)
+
+    def test_zero_variance_history_gives_finite_scores(self):
+        state = self.stats.empty_state()
+        self.observe_days(state, [50.0] * MIN_SAMPLES + [50.0])
+        result = self.stats.observe(state, 51.0, 'Food', '2025-02-01')
+        self.assertFalse(result['is_anomaly'])
+        self.assertIsNotNone(result['category_zscore'])
+        self.assertIsNotNone(result['daily_zscore'])
+        self.assertLess(result['category_zscore'], 1)
+
+    def test_daily_total_rolls_over_per_day(self):
+        state = self.stats.empty_state()
+        self.stats.observe(state, 10, 'Food', '2025-01-01')
+        self.stats.observe(state, 15, 'Travel', '2025-01-01')
+        self.stats.observe(state, 5, 'Food', '2025-01-02')
+        self.assertEqual(state['daily']['count'], 1)
+        self.assertEqual(state['daily']['mean'], 25)
+        self.assertEqual(state['day_total'], 5)
+
+    def test_rebuild_matches_sequential_record_expense(self):
+        amounts = [100, 120, 80, 95, 300, 110, 105, 90, 2000]
+        expenses = []
+        for i, amount in enumerate(amounts):
+            day = date(2025, 1, 1) + timedelta(days=i // 2)
+            category = 'Food' if i % 3 else 'Travel'
+            expenses.append(self.make_expense(amount, 'x', day, category))
+
+        for expense in expenses:
+            self.stats.record_expense(expense)
+        live = self.stats.load_state()
+
+        rebuilt = self.stats.rebuild(list(reversed(expenses)))
+        self.assertEqual(rebuilt, live)
+        self.assertEqual(self.stats.load_state(), live)
+
+
+class AddExpenseAnomalyTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.factory = APIRequestFactory()
+        self.user = User(id=1, username='tester')
+
+    def post_expense(self):
+        request = self.factory.post('/api/expenses/add/', {'amount': 50, 'description': 'coffee'}, format='json')
+        force_authenticate(request, user=self.user)
+        return add_expense(request)
+
+    def test_response_includes_anomaly(self):
+        with override_settings(BASE_DIR=self.tmp_dir):
+            response = self.post_expense()
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['anomaly']['is_anomaly'])
+
+    def test_stats_failure_does_not_fail_saved_expense(self):
+        with override_settings(BASE_DIR=self.tmp_dir), \
+                mock.patch.object(SpendingStats, 'save_state', side_effect=OSError('disk full')):
+            response = self.post_expense()
+            saved = ExpenseManager(self.user.id).get_expenses_from_excel()
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data['anomaly'])
+        self.assertEqual(len(saved), 1)
@@ -15,6 +15,7 @@ urlpatterns = [
     path('expenses/add/', views.add_expense, name='add_expense'),
     path('expenses/stats/', views.get_expense_stats, name='get_expense_stats'),
     path('expenses/export/', views.export_excel, name='export_excel'),
+    path('expenses/recurring/', views.get_recurring_expenses, name='get_recurring_expenses'),
     
     # Test endpoint (allow any)
     path('test/', views.test_connection, name='test_connection'),
@@ -9,9 +9,12 @@ from django.conf import settings
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
+from .anomaly import SpendingStats
+from .recurring import RecurringExpenseDetector
 
 class ExpenseManager:
     def __init__(self, user_id):
+        self.user_id = user_id
         # Create user-specific excel files directory
         self.excel_dir = os.path.join(settings.BASE_DIR, 'excel_files')
         if not os.path.exists(self.excel_dir):
@@ -103,9 +106,17 @@ def add_expense(request):
         success = expense_manager.save_expense_to_excel(expense_data)
         
         if success:
+            anomaly = None
+            if getattr(settings, 'EXPENSE_ANOMALY_DETECTION', True):
+                # The expense is already saved, so a stats failure must not turn into an error
+                try:
+                    anomaly = SpendingStats(expense_manager).record_expense(expense_data)
+                except Exception as e:
+                    print(f"Error updating spending stats: {e}")
             return Response({
                 'status': 'success', 
                 'expense': expense_data,
+                'anomaly': anomaly,
                 'message': 'Expense saved to Excel successfully!'
             })
         else:
@@ -179,6 +190,18 @@ def get_expense_stats(request):
     except Exception as e:
         return Response({'status': 'error', 'message': str(e)}, status=500)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_recurring_expenses(request):
+    """API endpoint to get recurring expenses found by the nightly detection job"""
+    try:
+        user = request.user
+        detector = RecurringExpenseDetector(ExpenseManager(user.id))
+        recurring = detector.detect()
+        return Response({'status': 'success', 'recurring': recurring})
+    except Exception as e:
+        return Response({'status': 'error', 'message': str(e)}, status=500)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def export_excel(request):